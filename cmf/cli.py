@@ -1,13 +1,25 @@
 import argparse
 import sys
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Dict, List, Optional, Tuple
 
 from .collector import collect_seller_items_for_url
-from .http_client import http_get
+from .http_client import close_session, http_get
 from .multipart import build_multipart_body, http_post_multipart
-from .parsers import extract_hidden_input_values, extract_seller_href_prices, parse_ajax_response
+from .parsers import HIDDEN_INPUT_NAMES, extract_hidden_input_values, extract_seller_href_prices, parse_ajax_response
 from .utils import parse_headers, sanitize_cookie_header
 
+# Product URLs collected in parallel per interactive batch; each one paginates independently.
+MAX_CONCURRENT_URLS = 8
+
+
+def _collect_or_error(url: str, cookie: str) -> Tuple[Dict[str, List[str]], Optional[Exception]]:
+    """Run one URL's collection on a worker thread, returning the error instead of raising it."""
+    try:
+        return collect_seller_items_for_url(url, cookie), None
+    except Exception as exc:
+        return {}, exc
+
 
 def run_cli(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Card Market Finder CLI")
@@ -20,7 +32,13 @@ def run_cli(argv: Optional[List[str]] = None) -> int:
     parser.add_argument("--file", action="append", help="File field as fieldName=path/to/file. May be repeated.")
 
     args = parser.parse_args(argv)
+    try:
+        return _run(args)
+    finally:
+        close_session()
+
 
+def _run(args: argparse.Namespace) -> int:
     try:
         cli_headers: Dict[str, str] = parse_headers(args.header or [])
     except ValueError as exc:
@@ -64,8 +82,8 @@ def run_cli(argv: Optional[List[str]] = None) -> int:
             print("Error: both --url and --cookie must be provided.", file=sys.stderr)
             return 2
         html = http_get(args.url, args.cookie, cli_headers)
-        values = extract_hidden_input_values(html, ["__cmtkn", "idProduct", "isSingle"])
-        for k in ["__cmtkn", "idProduct", "isSingle"]:
+        values = extract_hidden_input_values(html, HIDDEN_INPUT_NAMES)
+        for k in HIDDEN_INPUT_NAMES:
             print(f"{k}={values[k]}")
         for href, price in extract_seller_href_prices(html):
             suffix = f" | price={price}" if price else ""
@@ -89,29 +107,27 @@ def run_cli(argv: Optional[List[str]] = None) -> int:
             print("Error: no valid URLs provided.", file=sys.stderr)
             continue
 
-        per_url_lists: List[List[Tuple[str, Optional[str]]]] = []
-        for u in url_list:
-            try:
-                per_url_lists.append(collect_seller_items_for_url(u, cookie))
-            except Exception as exc:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_URLS, len(url_list))) as executor:
+            results = list(executor.map(lambda u: _collect_or_error(u, cookie), url_list))
+        failed = False
+        for u, (_items, exc) in zip(url_list, results):
+            if exc is not None:
                 print(f"Error processing {u}: {exc}", file=sys.stderr)
-                per_url_lists = []
-                break
-        if not per_url_lists:
+                failed = True
+        if failed:
             continue
+        # href -> prices per URL (hrefs without a price map to an empty list)
+        per_url_prices = [href_prices for href_prices, _exc in results]
 
-        href_sets = [set(h for (h, _p) in lst) for lst in per_url_lists]
-        common_hrefs = set.intersection(*href_sets) if len(href_sets) > 1 else href_sets[0]
+        common_hrefs: AbstractSet[str] = per_url_prices[0].keys()
+        for href_prices in per_url_prices[1:]:
+            common_hrefs = common_hrefs & href_prices.keys()
         if not common_hrefs:
             print("Error: no common seller profiles found across provided URLs", file=sys.stderr)
             continue
 
         for href in sorted(common_hrefs):
-            prices: List[str] = []
-            for lst in per_url_lists:
-                for (h, p) in lst:
-                    if h == href and p:
-                        prices.append(p)
+            prices = [p for href_prices in per_url_prices for p in href_prices[href]]
             print(f"sellerHref={href} | prices=[{', '.join(prices)}]")
 
     return 0
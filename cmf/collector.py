@@ -1,16 +1,18 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List
 
-from .http_client import http_get
-from .parsers import extract_hidden_input_values, extract_seller_href_prices
+from .http_client import http_get_bytes
+from .parsers import HIDDEN_INPUT_NAMES, add_seller_items, extract_hidden_input_values, extract_seller_href_prices
 from .pagination import paginate_load_more_collect
 
 POST_URL = "https://www.cardmarket.com/en/Pokemon/AjaxAction/Product_LoadMoreArticles"
 
 
-def collect_seller_items_for_url(url: str, cookie: str) -> List[Tuple[str, Optional[str]]]:
-    """Collect (href, price) pairs from the product page and all paginated results, preserving duplicates."""
-    html = http_get(url, cookie)
-    values = extract_hidden_input_values(html, ["__cmtkn", "idProduct", "isSingle"])  # isSingle kept for parity
-    items = list(extract_seller_href_prices(html))
-    items.extend(paginate_load_more_collect(POST_URL, values["__cmtkn"], values["idProduct"], cookie or None, None))
+def collect_seller_items_for_url(url: str, cookie: str) -> Dict[str, List[str]]:
+    """Collect seller href -> prices from the product page and all paginated results, keeping every price."""
+    html = http_get_bytes(url, cookie)  # parsers read bytes and decode only what they need
+    values = extract_hidden_input_values(html, HIDDEN_INPUT_NAMES)
+    items = add_seller_items({}, extract_seller_href_prices(html))
+    paged = paginate_load_more_collect(POST_URL, values["__cmtkn"], values["idProduct"], cookie or None, None)
+    for href, prices in paged.items():
+        items.setdefault(href, []).extend(prices)
     return items
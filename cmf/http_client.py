@@ -1,8 +1,207 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import base64
+import functools
+import http.client
+import io
+import re
+import threading
+import urllib.error
 import urllib.request
+from urllib.parse import unquote, urljoin, urlsplit
 
 DEFAULT_UA = "card-market-finder/1.0 (+https://localhost) Python-urllib"
 
+# Idle keep-alive connections kept per (scheme, netloc); extra ones are closed.
+POOL_MAXSIZE = 20
+MAX_REDIRECTS = 10
+
+_CHARSET_RE = re.compile(r"charset=[\"']?([^;\s\"']+)", re.IGNORECASE)
+
+_POOL: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+_POOL_LOCK = threading.Lock()
+# Bumped by close_session(); connections checked out before that are closed on return.
+_POOL_GENERATION = 0
+
+# Errors raised when the server silently dropped an idle keep-alive connection.
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, ConnectionAbortedError, BrokenPipeError)
+
+
+@functools.lru_cache(maxsize=64)
+def _proxy_for(scheme: str, netloc: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Return (proxy host:port, Proxy-Authorization value) for a target, or None to connect directly.
+
+    Proxies come from urllib.request.getproxies() and proxy_bypass() (HTTP(S)_PROXY and
+    NO_PROXY, or the system settings on Windows and macOS), as urlopen would use them.
+    """
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(netloc):
+        return None
+    parts = urlsplit(proxy if "://" in proxy else "http://" + proxy)
+    auth = None
+    if parts.username is not None:
+        creds = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        auth = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    return parts.netloc.rpartition("@")[2], auth
+
+
+def _checkout(key: Tuple[str, str], timeout_seconds: float) -> Tuple[http.client.HTTPConnection, bool]:
+    """Return (connection, reused) for the host, preferring an idle pooled connection."""
+    with _POOL_LOCK:
+        idle = _POOL.get(key)
+        conn = idle.pop() if idle else None
+    if conn is not None:
+        conn.timeout = timeout_seconds
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout_seconds)
+        return conn, True
+    scheme, netloc = key
+    conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    proxy = _proxy_for(scheme, netloc)
+    if proxy is None:
+        return conn_cls(netloc, timeout=timeout_seconds), False
+    proxy_netloc, proxy_auth = proxy
+    if scheme == "http":
+        # Plain HTTP goes to the proxy with absolute request URLs (see _send_once).
+        return http.client.HTTPConnection(proxy_netloc, timeout=timeout_seconds), False
+    conn = http.client.HTTPSConnection(proxy_netloc, timeout=timeout_seconds)
+    conn.set_tunnel(netloc, headers={"Proxy-Authorization": proxy_auth} if proxy_auth else None)
+    return conn, False
+
+
+def _checkin(key: Tuple[str, str], conn: http.client.HTTPConnection, generation: int) -> None:
+    with _POOL_LOCK:
+        if generation == _POOL_GENERATION:
+            idle = _POOL.setdefault(key, [])
+            if len(idle) < POOL_MAXSIZE:
+                idle.append(conn)
+                return
+    conn.close()
+
+
+def close_session() -> None:
+    """Close all pooled keep-alive connections.
+
+    Requests still in flight (such as an abandoned pagination prefetch) close their
+    connection when they finish instead of returning it to the pool.
+    """
+    global _POOL_GENERATION
+    with _POOL_LOCK:
+        _POOL_GENERATION += 1
+        conns = [conn for idle in _POOL.values() for conn in idle]
+        _POOL.clear()
+    for conn in conns:
+        conn.close()
+
+
+@functools.lru_cache(maxsize=64)
+def _split_target(url: str) -> Tuple[Tuple[str, str], str]:
+    """Return the pool key (scheme, netloc) and request path for a URL.
+
+    Pagination POSTs the same URL for every page, so the split is memoized.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"unsupported URL scheme: {parts.scheme!r}")
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (parts.scheme, parts.netloc), path
+
+
+def _send_once(method: str, url: str, headers: Dict[str, str], body: Optional[Union[bytes, Iterable[bytes]]], timeout_seconds: float) -> Tuple[int, str, http.client.HTTPMessage, bytes]:
+    key, path = _split_target(url)
+    if key[0] == "http":
+        proxy = _proxy_for(*key)
+        if proxy is not None:
+            path = f"http://{key[1]}{path}"
+            if proxy[1] and not any(k.lower() == "proxy-authorization" for k in headers):
+                headers = {**headers, "Proxy-Authorization": proxy[1]}
+    while True:
+        generation = _POOL_GENERATION
+        conn, reused = _checkout(key, timeout_seconds)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except _STALE_ERRORS as exc:
+            conn.close()
+            if reused:
+                continue  # retry once per stale connection on a fresh socket
+            raise urllib.error.URLError(exc) from exc
+        except http.client.HTTPException:
+            conn.close()
+            raise
+        except OSError as exc:
+            conn.close()
+            raise urllib.error.URLError(exc) from exc
+        if resp.will_close:
+            conn.close()
+        else:
+            _checkin(key, conn, generation)
+        return resp.status, resp.reason, resp.headers, raw
+
+
+def send_request(method: str, url: str, headers: Dict[str, str], body: Optional[Union[bytes, Iterable[bytes]]] = None, timeout_seconds: float = 30.0) -> Tuple[bytes, http.client.HTTPMessage]:
+    """Send a request over a pooled keep-alive connection and return (body_bytes, response_headers).
+
+    Redirects are followed like urllib does (POST becomes GET on 301/302/303) and
+    error statuses raise urllib.error.HTTPError. An iterable ``body`` is streamed; it
+    needs a Content-Length header and must be re-iterable so a stale socket can be retried.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        status, reason, resp_headers, raw = _send_once(method, url, headers, body, timeout_seconds)
+        location = resp_headers.get("Location")
+        redirectable = method == "GET" or status in (301, 302, 303)
+        if status in (301, 302, 303, 307, 308) and location and redirectable:
+            url = urljoin(url, location)
+            if method != "GET":
+                method, body = "GET", None
+                headers = {k: v for k, v in headers.items() if k.lower() not in ("content-type", "content-length")}
+            continue
+        if status >= 400 or status in (301, 302, 303, 307, 308):
+            raise urllib.error.HTTPError(url, status, reason, resp_headers, io.BytesIO(raw))
+        return raw, resp_headers
+    raise urllib.error.HTTPError(url, status, "redirect loop", resp_headers, io.BytesIO(raw))
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_headers(cookie: str, extra_headers: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    headers: Dict[str, str] = {"User-Agent": DEFAULT_UA, "Accept": "*/*"}
+    if cookie:
+        headers["Cookie"] = cookie
+    # Header names are case-insensitive: an extra header replaces any default of that name.
+    for name, value in extra_headers:
+        for existing in [k for k in headers if k.lower() == name.lower()]:
+            del headers[existing]
+        headers[name] = value
+    return headers
+
+
+def build_headers(cookie: Optional[str] = "", extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Return a new request header dict (User-Agent, Accept, Cookie, then extra headers).
+
+    The assembled headers are memoized per (cookie, extra_headers), since the CLI sends
+    the same pair on every request; callers receive a copy they may modify.
+    """
+    frozen = tuple(extra_headers.items()) if extra_headers else ()
+    return dict(_cached_headers(cookie or "", frozen))
+
+
+def decode_response(raw: bytes, resp_headers: http.client.HTTPMessage) -> str:
+    """Decode a response body with the charset from its Content-Type, defaulting to UTF-8."""
+    m = _CHARSET_RE.search(resp_headers.get("Content-Type") or "")
+    encoding = m.group(1) if m else "utf-8"
+    try:
+        return raw.decode(encoding, errors="ignore")
+    except LookupError:
+        return raw.decode("utf-8", errors="ignore")
+
+
+def http_get_bytes(url: str, cookie: str = "", extra_headers: Optional[Dict[str, str]] = None, timeout_seconds: float = 30.0) -> bytes:
+    """Perform an HTTP GET and return the undecoded response body (arguments as for http_get)."""
+    raw, _resp_headers = send_request("GET", url, build_headers(cookie, extra_headers), timeout_seconds=timeout_seconds)
+    return raw
+
 
 def http_get(url: str, cookie: str = "", extra_headers: Optional[Dict[str, str]] = None, timeout_seconds: float = 30.0) -> str:
     """Perform an HTTP GET and return response text.
@@ -13,20 +212,6 @@ def http_get(url: str, cookie: str = "", extra_headers: Optional[Dict[str, str]]
         extra_headers: Additional headers to include.
         timeout_seconds: Socket timeout.
     """
-    headers: Dict[str, str] = {"User-Agent": DEFAULT_UA, "Accept": "*/*"}
-    if cookie:
-        headers["Cookie"] = cookie
-    if extra_headers:
-        headers.update(extra_headers)
-
-    req = urllib.request.Request(url=url, headers=headers, method="GET")
-    with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
-        raw = resp.read()
-        content_type = resp.headers.get("Content-Type") or ""
-        encoding = "utf-8"
-        if "charset=" in content_type:
-            try:
-                encoding = content_type.split("charset=")[-1].split(";")[0].strip()
-            except Exception:
-                encoding = "utf-8"
-        return raw.decode(encoding, errors="replace")
+    headers = build_headers(cookie, extra_headers)
+    raw, resp_headers = send_request("GET", url, headers, timeout_seconds=timeout_seconds)
+    return decode_response(raw, resp_headers)
@@ -1,62 +1,121 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from http.client import HTTPMessage
 import mimetypes
 import os
-import urllib.request
 import uuid
 
-from .http_client import DEFAULT_UA
+from .http_client import build_headers, decode_response, send_request
 
+FILE_CHUNK_SIZE = 64 * 1024
 
-def build_multipart_body(fields: Dict[str, str], files: List[Tuple[str, str]]) -> Tuple[bytes, str]:
-    """Build a multipart/form-data body and return (body_bytes, content_type)."""
-    boundary = "----cmf-" + uuid.uuid4().hex
-    crlf = "\r\n"
-    parts: List[bytes] = []
+# Part headers as bytes templates: one C-level %-format per part.
+_FIELD_PART = b'--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n%s\r\n'
+_FILE_PART_HEADER = b'--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\nContent-Type: %s\r\n\r\n'
+_CLOSING = b"--%s--\r\n"
+_CRLF = b"\r\n"
 
-    def add(text: str) -> None:
-        parts.append(text.encode("utf-8"))
 
+def _new_boundary() -> str:
+    return "----cmf-" + uuid.uuid4().hex
+
+
+def encode_multipart_field(boundary: str, name: str, value: str) -> bytes:
+    """Encode one text form field part (without the closing boundary)."""
+    return _FIELD_PART % (boundary.encode("ascii"), name.encode("utf-8"), value.encode("utf-8"))
+
+
+def encode_multipart_closing(boundary: str) -> bytes:
+    """Encode the closing boundary line that ends a multipart body."""
+    return _CLOSING % boundary.encode("ascii")
+
+
+def build_multipart_body_template(static_fields: Dict[str, str]) -> Tuple[bytes, str]:
+    """Encode fields that do not change between requests once and return (prefix_bytes, boundary).
+
+    Callers append their varying parts with encode_multipart_field and finish with
+    encode_multipart_closing.
+    """
+    boundary = _new_boundary()
+    prefix = b"".join(encode_multipart_field(boundary, name, value) for name, value in static_fields.items())
+    return prefix, boundary
+
+
+class MultipartBody:
+    """Re-iterable multipart body that streams file parts from disk instead of buffering them.
+
+    ``parts`` holds encoded bytes and file paths; ``len()`` gives the Content-Length.
+    """
+
+    def __init__(self, parts: List[Union[bytes, str]]):
+        self.parts = parts
+        self.length = sum(len(p) if isinstance(p, bytes) else os.path.getsize(p) for p in parts)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            with open(part, "rb") as f:
+                while True:
+                    chunk = f.read(FILE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+
+def build_multipart_body(fields: Dict[str, str], files: List[Tuple[str, str]]) -> Tuple[Union[bytes, MultipartBody], str]:
+    """Build a multipart/form-data body and return (body, content_type).
+
+    Without files the body is plain bytes; otherwise a MultipartBody that streams file contents on send.
+    """
+    boundary = _new_boundary()
+    boundary_b = boundary.encode("ascii")
+    parts: List[Union[bytes, str]] = []
+    # Text parts accumulate in one buffer, flushed as a single bytes segment before each file.
+    buf = bytearray()
     for name, value in fields.items():
-        add(f"--{boundary}{crlf}")
-        add(f"Content-Disposition: form-data; name=\"{name}\"{crlf}{crlf}")
-        add(f"{value}{crlf}")
+        buf += _FIELD_PART % (boundary_b, name.encode("utf-8"), value.encode("utf-8"))
+    content_type_header = f"multipart/form-data; boundary={boundary}"
+    if not files:
+        # Text-only bodies need no streaming wrapper.
+        buf += _CLOSING % boundary_b
+        return bytes(buf), content_type_header
 
     for field_name, file_path in files:
         filename = os.path.basename(file_path)
         guessed_type, _ = mimetypes.guess_type(filename)
         content_type = guessed_type or "application/octet-stream"
-        add(f"--{boundary}{crlf}")
-        add(f"Content-Disposition: form-data; name=\"{field_name}\"; filename=\"{filename}\"{crlf}")
-        add(f"Content-Type: {content_type}{crlf}{crlf}")
-        with open(file_path, "rb") as f:
-            parts.append(f.read())
-        add(crlf)
+        buf += _FILE_PART_HEADER % (boundary_b, field_name.encode("utf-8"), filename.encode("utf-8"), content_type.encode("utf-8"))
+        parts.append(bytes(buf))
+        parts.append(file_path)
+        buf = bytearray(_CRLF)
+
+    buf += _CLOSING % boundary_b
+    parts.append(bytes(buf))
+    return MultipartBody(parts), content_type_header
+
 
-    add(f"--{boundary}--{crlf}")
-    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+def http_post_multipart_bytes(url: str, body_bytes: Union[bytes, MultipartBody], content_type_header: str, cookie: Optional[str] = None, extra_headers: Optional[Dict[str, str]] = None, timeout_seconds: float = 60.0) -> bytes:
+    """POST a multipart/form-data request and return the undecoded response body (arguments as for http_post_multipart)."""
+    raw, _resp_headers = _post_multipart(url, body_bytes, content_type_header, cookie, extra_headers, timeout_seconds)
+    return raw
 
 
-def http_post_multipart(url: str, body_bytes: bytes, content_type_header: str, cookie: Optional[str] = None, extra_headers: Optional[Dict[str, str]] = None, timeout_seconds: float = 60.0) -> str:
+def http_post_multipart(url: str, body_bytes: Union[bytes, MultipartBody], content_type_header: str, cookie: Optional[str] = None, extra_headers: Optional[Dict[str, str]] = None, timeout_seconds: float = 60.0) -> str:
     """POST a multipart/form-data request and return response text."""
-    headers: Dict[str, str] = {
-        "User-Agent": DEFAULT_UA,
-        "Accept": "*/*",
-        "Content-Type": content_type_header,
-        "Content-Length": str(len(body_bytes)),
-    }
-    if cookie:
-        headers["Cookie"] = cookie
-    if extra_headers:
-        headers.update(extra_headers)
-
-    req = urllib.request.Request(url=url, data=body_bytes, headers=headers, method="POST")
-    with urllib.request.urlopen(req, timeout=timeout_seconds) as resp:
-        raw = resp.read()
-        content_type = resp.headers.get("Content-Type") or ""
-        encoding = "utf-8"
-        if "charset=" in content_type:
-            try:
-                encoding = content_type.split("charset=")[-1].split(";")[0].strip()
-            except Exception:
-                encoding = "utf-8"
-        return raw.decode(encoding, errors="replace")
+    raw, resp_headers = _post_multipart(url, body_bytes, content_type_header, cookie, extra_headers, timeout_seconds)
+    return decode_response(raw, resp_headers)
+
+
+def _post_multipart(url: str, body_bytes: Union[bytes, MultipartBody], content_type_header: str, cookie: Optional[str], extra_headers: Optional[Dict[str, str]], timeout_seconds: float) -> Tuple[bytes, HTTPMessage]:
+    headers = build_headers(cookie, extra_headers)
+    # Extra headers keep precedence, as they did when applied last; names compare case-insensitively.
+    present = {name.lower() for name in headers}
+    if "content-type" not in present:
+        headers["Content-Type"] = content_type_header
+    if "content-length" not in present:
+        headers["Content-Length"] = str(len(body_bytes))
+    return send_request("POST", url, headers, body_bytes, timeout_seconds)
@@ -1,7 +1,40 @@
 from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import threading
 
-from .multipart import build_multipart_body, http_post_multipart
-from .parsers import parse_ajax_response, extract_seller_href_prices
+from .multipart import build_multipart_body_template, encode_multipart_closing, encode_multipart_field, http_post_multipart_bytes
+from .parsers import SellerItemParser, add_seller_items, extract_seller_href_prices, parse_ajax_response
+
+# Parsed (rows_html, newPage) per page request, shared by all paginations in this process.
+RESPONSE_CACHE_SIZE = 128
+_RESPONSE_CACHE: "OrderedDict[Tuple[str, bytes], Tuple[str, str]]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _page_cache_key(post_url: str, id_product: str, page: str, cookie: Optional[str], extra_headers: Optional[Dict[str, str]]) -> Tuple[str, bytes]:
+    """Key a page request by what determines its rows; __cmtkn and the boundary change per page load."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (cookie or "", repr(sorted((extra_headers or {}).items())), id_product, page):
+        digest.update(part.encode("utf-8") + b"\0")
+    return post_url, digest.digest()
+
+
+def _cache_get(key: Tuple[str, bytes]) -> Optional[Tuple[str, str]]:
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+        return entry
+
+
+def _cache_put(key: Tuple[str, bytes], entry: Tuple[str, str]) -> None:
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = entry
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
 
 
 def paginate_load_more_collect(
@@ -10,17 +43,55 @@ def paginate_load_more_collect(
     id_product: str,
     cookie: Optional[str],
     extra_headers: Optional[Dict[str, str]] = None,
-) -> List[Tuple[str, Optional[str]]]:
-    """Collect seller items across all pages until newPage == -1, preserving duplicates."""
-    collected: List[Tuple[str, Optional[str]]] = []
+) -> Dict[str, List[str]]:
+    """Collect seller href -> prices across all pages until newPage == -1, keeping every price in page order."""
+    collected: Dict[str, List[str]] = {}
+    # Only "page" changes between requests; encode the rest of the body once.
+    prefix, boundary = build_multipart_body_template({"__cmtkn": cmtkn, "idProduct": id_product})
+    suffix = encode_multipart_field(boundary, "filterSettings", "[]") + encode_multipart_closing(boundary)
+    ctype = f"multipart/form-data; boundary={boundary}"
+
+    def fetch_page(page: str) -> Tuple[Tuple[str, bytes], Tuple[str, str]]:
+        # Not cached here: the loop caches only the pages it uses, not a wasted guess.
+        key = _page_cache_key(post_url, id_product, page, cookie, extra_headers)
+        entry = _cache_get(key)
+        if entry is None:
+            body = b"".join((prefix, encode_multipart_field(boundary, "page", page), suffix))
+            raw = http_post_multipart_bytes(post_url, body, ctype, cookie=cookie, extra_headers=extra_headers)
+            entry = parse_ajax_response(raw)
+        return key, entry
+
     page: str = "1"
-    while True:
-        fields = {"__cmtkn": cmtkn, "idProduct": id_product, "page": page, "filterSettings": "[]"}
-        body, ctype = build_multipart_body(fields, [])
-        text = http_post_multipart(post_url, body, ctype, cookie=cookie, extra_headers=extra_headers)
-        rows_html, new_page = parse_ajax_response(text)
-        collected.extend(extract_seller_href_prices(rows_html))
-        if new_page.strip() == "-1":
-            break
-        page = new_page.strip()
+    # Seller rows are parsed on a worker thread while the next page is fetched;
+    # only newPage is needed to continue the loop. While a page is in flight the
+    # following page number is requested speculatively and used if newPage agrees.
+    parsed: List["Future[List[Tuple[str, Optional[str]]]]"] = []
+    # One parser for every page; only the single parse worker touches it.
+    seller_parser = SellerItemParser()
+    fetch_executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as parse_executor:
+            pending = fetch_executor.submit(fetch_page, page)
+            while True:
+                guess = str(int(page) + 1) if page.isdigit() else None
+                prefetch = fetch_executor.submit(fetch_page, guess) if guess else None
+                key, entry = pending.result()
+                _cache_put(key, entry)
+                rows_html, new_page = entry
+                parsed.append(parse_executor.submit(extract_seller_href_prices, rows_html, seller_parser))
+                new_page = new_page.strip()
+                if prefetch is not None and new_page == guess:
+                    pending = prefetch
+                else:
+                    if prefetch is not None:
+                        prefetch.cancel()  # a wasted guess; its result or error is discarded
+                    if new_page == "-1":
+                        break
+                    pending = fetch_executor.submit(fetch_page, new_page)
+                page = new_page
+    finally:
+        # Do not wait for a speculative request past the last page.
+        fetch_executor.shutdown(wait=False)
+    for fut in parsed:
+        add_seller_items(collected, fut.result())
     return collected
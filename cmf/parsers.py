@@ -1,56 +1,183 @@
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import AnyStr, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+from html import unescape
 from html.parser import HTMLParser
-import base64
+import binascii
+import codecs
 import re
 
+FEED_CHUNK_SIZE = 64 * 1024
+# Hidden inputs the product page must carry for pagination (isSingle is read for parity only).
+HIDDEN_INPUT_NAMES = ("__cmtkn", "idProduct", "isSingle")
+
+# <input> tags with quote-aware attribute text (group 2). Comments, script/style bodies
+# and other start tags are matched too (group 2 is None) so inputs inside them are skipped,
+# as HTMLParser does; group 3 is empty for a start tag whose quoted value never closes.
+_INPUT_TAG_PATTERN = (
+    r"""<!--.*?(?:-->|\Z)|<(script|style)\b.*?(?:</\1|\Z)"""
+    r"""|<input\b((?:[^=>]|=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["']))*)>"""
+    r"""|<[a-z](?:[^=>]|=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["']))*(>?)"""
+)
+_INPUT_TAG_RE = re.compile(_INPUT_TAG_PATTERN, re.IGNORECASE | re.DOTALL)
+_INPUT_TAG_BYTES_RE = re.compile(_INPUT_TAG_PATTERN.encode("ascii"), re.IGNORECASE | re.DOTALL)
+_ATTR_RE = re.compile(r"""([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+
+
+def _decode_html(data: bytes) -> str:
+    """Decode raw page bytes; Cardmarket serves UTF-8."""
+    return data.decode("utf-8", errors="ignore")
+
+
+# HTMLParser passes tag and attribute names already lowercased, so the handlers
+# below compare them directly.
+
 
 class HiddenInputParser(HTMLParser):
-    """HTML parser that collects values for specific hidden input names."""
+    """HTML parser that collects values for specific hidden input names.
 
-    def __init__(self, target_names: Iterable[str]):
+    The first value seen for a name is kept, as in the regex scan. Once every target name
+    has a value, ``done`` is set and further tags are ignored.
+    """
+
+    def __init__(self, target_names: Iterable[str]) -> None:
         super().__init__()
-        self.target_names = {name.lower() for name in target_names}
+        names = list(target_names)
+        self.target_names = {name.lower() for name in names}
         self.found_values: Dict[str, str] = {}
+        self.pending_names = set(names)
+        self.done: bool = not self.pending_names
 
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
-        if tag.lower() != "input":
+        if self.done or tag != "input":
             return
-        attrs_dict: Dict[str, Optional[str]] = {k.lower(): v for k, v in attrs}
-        input_type = (attrs_dict.get("type") or "").lower()
+        name: Optional[str] = None
+        input_type = ""
+        value = ""
+        for k, v in attrs:
+            if k == "name":
+                name = v
+            elif k == "type":
+                input_type = v or ""
+            elif k == "value":
+                value = v or ""
+        if not name or name.lower() not in self.target_names or name in self.found_values:
+            return  # not a target, or already seen: the first value wins
+        input_type = input_type.lower()
         if input_type and input_type != "hidden":
             return
-        name = attrs_dict.get("name")
-        if not name:
-            return
-        lname = name.lower()
-        if lname not in self.target_names:
-            return
-        value = attrs_dict.get("value") or ""
         self.found_values[name] = value
+        self.pending_names.discard(name)
+        if not self.pending_names:
+            self.done = True
+
 
+def _scan_hidden_inputs(html_text: Union[str, bytes], required_names: Sequence[str]) -> Dict[str, str]:
+    """Collect hidden input values with a regex scan, stopping once every name has been seen.
 
-def extract_hidden_input_values(html_text: str, required_names: List[str]) -> Dict[str, str]:
-    parser = HiddenInputParser(required_names)
-    parser.feed(html_text)
-    values = {name: parser.found_values.get(name) for name in required_names}
+    For bytes input only the matched <input> tags are decoded. An <input> whose attributes
+    the scan cannot read ends it early, so the caller falls back to HiddenInputParser.
+    """
+    wanted = set(required_names)
+    found: Dict[str, str] = {}
+    tag_re = _INPUT_TAG_BYTES_RE if isinstance(html_text, bytes) else _INPUT_TAG_RE
+    for tag in tag_re.finditer(html_text):
+        tag_attrs = tag.group(2)
+        if tag_attrs is None:
+            open_tag_end = tag.group(3)
+            if open_tag_end is not None and not open_tag_end:
+                return found  # unclosed quoted value: leave it to the parser
+            continue  # comment, script/style body or another start tag
+        if isinstance(tag_attrs, bytes):
+            tag_attrs = _decode_html(tag_attrs)
+        attrs: Dict[str, str] = {}
+        end = 0
+        for m in _ATTR_RE.finditer(tag_attrs):
+            if tag_attrs[end:m.start()].strip(" \t\n\r\f/"):
+                return found
+            end = m.end()
+            value = next((g for g in m.group(2, 3, 4) if g is not None), "")
+            attrs[m.group(1).lower()] = unescape(value) if "&" in value else value
+        if tag_attrs[end:].strip(" \t\n\r\f/"):
+            return found
+        input_type = attrs.get("type", "").lower()
+        if input_type and input_type != "hidden":
+            continue
+        name = attrs.get("name")
+        if name in wanted and name not in found:
+            found[name] = attrs.get("value", "")
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+def _feed_until_done(parser: HiddenInputParser, html_text: Union[str, bytes]) -> None:
+    """Feed the document in FEED_CHUNK_SIZE slices, stopping once the parser has every value.
+
+    Bytes are decoded incrementally, so the part after the last hidden input is never decoded.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore") if isinstance(html_text, bytes) else None
+    for offset in range(0, len(html_text), FEED_CHUNK_SIZE):
+        chunk = html_text[offset:offset + FEED_CHUNK_SIZE]
+        parser.feed(decoder.decode(chunk) if decoder is not None else chunk)
+        if parser.done:
+            return
+
+
+def extract_hidden_input_values(html_text: Union[str, bytes], required_names: Sequence[str]) -> Dict[str, str]:
+    found = _scan_hidden_inputs(html_text, required_names)
+    if len(found) < len(set(required_names)):
+        # Unusual markup the scan cannot read: fall back to the full HTML parser.
+        parser = HiddenInputParser(required_names)
+        _feed_until_done(parser, html_text)
+        found = parser.found_values
+    values = {name: found.get(name) for name in required_names}
     missing = [k for k, v in values.items() if v is None]
     if missing:
         raise ValueError(f"Missing required hidden inputs: {', '.join(missing)}")
     return {k: v or "" for k, v in values.items()}
 
 
+# Class sets SellerItemParser matches, tested as subsets of a tag's class set.
+# Update these together with _SELLER_MARKERS below if Cardmarket's row markup changes.
+_NO_CLASSES: FrozenSet[str] = frozenset()
+_SELLER_BLOCK_CLASSES = frozenset(("col-sellerProductInfo", "col"))
+_PRICE_CLASSES = frozenset(("color-primary", "fw-bold"))
+_SELLER_ROOT_CLASSES = frozenset(("seller-name", "d-flex"))
+_HAS_CONTENT_CLASSES = frozenset(("d-flex", "has-content-centered", "me-1"))
+# Elements without an end tag; they do not count towards SellerItemParser.element_depth.
+_VOID_ELEMENTS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"))
+
+
 class SellerItemParser(HTMLParser):
     """Collect seller profile hrefs and prices.
 
     Strategies:
       - Legacy: span.seller-name.d-flex → span.d-flex.has-content-centered.me-1 → a[href]
+        (only while ``legacy_enabled`` is set)
       - Preferred: within div.col-sellerProductInfo.col, capture descendant a[href] and
         sibling/descendant span with classes including color-primary and fw-bold (price)
     """
 
-    def __init__(self):
+    def __init__(self, legacy_enabled: bool = False) -> None:
         super().__init__()
-        self.stack: List[Tuple[str, List[str]]] = []
+        self.legacy_enabled = legacy_enabled
+        self._start_document()
+
+    def _start_document(self) -> None:
+        # Open <span> and open element counts.
+        self.span_depth: int = 0
+        self.element_depth: int = 0
+        # Per tag name: open element count (never below the true number, so an end tag
+        # with nothing to close is ignored) and the depth of the latest one opened.
+        self.open_counts: Dict[str, int] = {}
+        self.last_open_depth: Dict[str, int] = {}
+        # Legacy path: span depth and element depth at which the outermost
+        # span.seller-name.d-flex / span.d-flex.has-content-centered.me-1 opened
+        # (0 = not inside). The span closes on its own </span>, or when an end tag drops
+        # element_depth below its level, as a parent's end tag closes unclosed children.
+        self.seller_root_depth: int = 0
+        self.seller_root_level: int = 0
+        self.has_content_depth: int = 0
+        self.has_content_level: int = 0
         self.items: List[Tuple[str, Optional[str]]] = []  # (href, price)
         self.in_seller_block_depth: int = 0
         self.seller_block_nesting: int = 0
@@ -59,19 +186,28 @@ class SellerItemParser(HTMLParser):
         self.price_span_depth: int = 0
         self.current_price_parts: List[str] = []
 
+    def reuse(self) -> None:
+        """Reset the parser and its per-document state so it can parse another document."""
+        self.reset()
+        self._start_document()
+
     @staticmethod
-    def _classes(attrs: List[Tuple[str, Optional[str]]]) -> List[str]:
+    def _classes(attrs: List[Tuple[str, Optional[str]]]) -> FrozenSet[str]:
         for k, v in attrs:
-            if k.lower() == "class" and v:
-                return [c for c in v.split() if c]
-        return []
+            if k == "class" and v:
+                return frozenset(v.split())
+        return _NO_CLASSES
 
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
-        classes = self._classes(attrs)
-        self.stack.append((tag.lower(), classes))
+        # Only <div> and <span> classes are ever tested.
+        classes = self._classes(attrs) if tag == "div" or tag == "span" else _NO_CLASSES
+        if self.legacy_enabled and tag not in _VOID_ELEMENTS:
+            self.element_depth += 1
+            self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+            self.last_open_depth[tag] = self.element_depth
 
         # Detect start of seller block
-        if tag.lower() == "div" and ("col-sellerProductInfo" in classes and "col" in classes):
+        if tag == "div" and _SELLER_BLOCK_CLASSES <= classes:
             self.in_seller_block_depth += 1
             self.seller_block_nesting = 1
             self.current_href = None
@@ -82,37 +218,38 @@ class SellerItemParser(HTMLParser):
             self.seller_block_nesting += 1
 
         # Capture href inside seller block or legacy path
-        if tag.lower() == "a":
+        if tag == "a":
             if self.in_seller_block_depth > 0:
                 for k, v in attrs:
-                    if k.lower() == "href" and v and not self.current_href:
+                    if k == "href" and v and not self.current_href:
                         self.current_href = v
                         break
-            else:
-                has_seller_root = any(
-                    t == "span" and ("seller-name" in cls and "d-flex" in cls)
-                    for t, cls in self.stack[:-1]
-                )
-                has_inner = any(
-                    t == "span" and all(c in cls for c in ["d-flex", "has-content-centered", "me-1"])
-                    for t, cls in self.stack[:-1]
-                )
-                if has_seller_root and has_inner:
+            elif self.legacy_enabled:
+                if self.seller_root_depth and self.has_content_depth:
                     for k, v in attrs:
-                        if k.lower() == "href" and v:
+                        if k == "href" and v:
                             self.items.append((v, None))
                             break
 
+        if tag == "span":
+            self.span_depth += 1
+            if self.legacy_enabled:
+                if not self.seller_root_depth and _SELLER_ROOT_CLASSES <= classes:
+                    self.seller_root_depth = self.span_depth
+                    self.seller_root_level = self.element_depth
+                if not self.has_content_depth and _HAS_CONTENT_CLASSES <= classes:
+                    self.has_content_depth = self.span_depth
+                    self.has_content_level = self.element_depth
+
         # Capture price span within seller block
-        if self.in_seller_block_depth > 0 and tag.lower() == "span":
-            if ("color-primary" in classes) and ("fw-bold" in classes):
+        if self.in_seller_block_depth > 0 and tag == "span":
+            if _PRICE_CLASSES <= classes:
                 self.capture_price_text = True
                 self.price_span_depth = 1
             elif self.capture_price_text:
                 self.price_span_depth += 1
 
     def handle_endtag(self, tag: str) -> None:
-        tag_lower = tag.lower()
         if self.in_seller_block_depth > 0:
             self.seller_block_nesting -= 1
             if self.seller_block_nesting == 0:
@@ -125,24 +262,99 @@ class SellerItemParser(HTMLParser):
                 self.current_price_parts = []
                 self.in_seller_block_depth = 0
 
-        for i in range(len(self.stack) - 1, -1, -1):
-            if self.stack[i][0] == tag_lower:
-                if tag_lower == "span" and self.capture_price_text:
-                    if self.price_span_depth > 0:
-                        self.price_span_depth -= 1
-                    if self.price_span_depth == 0:
-                        self.capture_price_text = False
-                del self.stack[i:]
-                break
+        if self.legacy_enabled:
+            open_count = self.open_counts.get(tag, 0)
+            if not open_count:
+                return  # nothing of this name is open (or a void element)
+            self.open_counts[tag] = open_count - 1
+            # Close back to the latest element of this name, taking unclosed children with it.
+            opened_at = self.last_open_depth.get(tag, 0)
+            self.element_depth = opened_at - 1 if 0 < opened_at <= self.element_depth else self.element_depth - 1
+            if self.seller_root_level > self.element_depth:
+                self.seller_root_depth = self.seller_root_level = 0
+            if self.has_content_level > self.element_depth:
+                self.has_content_depth = self.has_content_level = 0
+
+        if tag == "span" and self.span_depth > 0:
+            if self.capture_price_text:
+                if self.price_span_depth > 0:
+                    self.price_span_depth -= 1
+                if self.price_span_depth == 0:
+                    self.capture_price_text = False
+            if self.seller_root_depth == self.span_depth:
+                self.seller_root_depth = self.seller_root_level = 0
+            if self.has_content_depth == self.span_depth:
+                self.has_content_depth = self.has_content_level = 0
+            self.span_depth -= 1
 
     def handle_data(self, data: str) -> None:
         if self.capture_price_text and self.in_seller_block_depth > 0:
             self.current_price_parts.append(data)
 
 
-def extract_seller_href_prices(html_text: str) -> List[Tuple[str, Optional[str]]]:
-    parser = SellerItemParser()
-    parser.feed(html_text)
+# Class names SellerItemParser reacts to: the preferred block and both legacy spans.
+_SELLER_MARKERS = ("col-sellerProductInfo", "seller-name", "has-content-centered")
+_SELLER_MARKERS_BYTES = tuple(m.encode("ascii") for m in _SELLER_MARKERS)
+_LEGACY_SELLER_MARKERS = _SELLER_MARKERS[1:]
+_LEGACY_SELLER_MARKERS_BYTES = _SELLER_MARKERS_BYTES[1:]
+
+
+# Start tags with quote-aware attribute text (group 4 is set for <div>, group 5 is the
+# closing ">"); comments and script/style bodies are matched whole so tags inside them
+# are skipped. A token is complete when its last matched group is 1, 3 or 5.
+_MARKUP_TOKEN_PATTERN = (
+    r"""<!--(?:.*?(-->)|.*)|<(script|style)\b(?:.*?(</\2)|.*)"""
+    r"""|<(?:(div)\b|[a-z])(?:[^=>]|=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["']))*(>)?"""
+)
+_MARKUP_TOKEN_RE = re.compile(_MARKUP_TOKEN_PATTERN, re.IGNORECASE | re.DOTALL)
+_MARKUP_TOKEN_BYTES_RE = re.compile(_MARKUP_TOKEN_PATTERN.encode("ascii"), re.IGNORECASE | re.DOTALL)
+
+
+def _seller_markup_start(html_text: Union[str, bytes]) -> int:
+    """Return the offset of the first <div> that may open a seller block, or -1 if there is none.
+
+    Markup before that tag cannot produce items, so product pages are not parsed from the top.
+    Markers inside comments and <script>/<style> bodies are skipped. When the markup cannot be
+    tokenized for certain (an unclosed comment, body or quoted value), parsing starts at 0.
+    """
+    if isinstance(html_text, bytes):
+        marker, token_re = _SELLER_MARKERS_BYTES[0], _MARKUP_TOKEN_BYTES_RE
+    else:
+        marker, token_re = _SELLER_MARKERS[0], _MARKUP_TOKEN_RE
+    if marker not in html_text:
+        return -1
+    for token in token_re.finditer(html_text):
+        closed_by = token.lastindex
+        if closed_by != 5:
+            if closed_by == 1 or closed_by == 3:
+                continue
+            return 0
+        if token.group(4) and marker in token.group():
+            return token.start()
+    return -1
+
+
+def extract_seller_href_prices(html_text: Union[str, bytes], parser: Optional[SellerItemParser] = None) -> List[Tuple[str, Optional[str]]]:
+    """Return (href, price) pairs; bytes input is decoded only from the first seller markup on.
+
+    A ``parser`` passed in is reused (and reset) instead of constructing a new one per document.
+    The legacy seller-name path is only tracked when the page carries both of its span classes;
+    such pages are parsed from the top, since an ancestor's end tag can close a legacy span.
+    """
+    legacy_markers = _LEGACY_SELLER_MARKERS_BYTES if isinstance(html_text, bytes) else _LEGACY_SELLER_MARKERS
+    # A legacy row needs both legacy span classes; without them that path cannot match.
+    legacy_enabled = all(marker in html_text for marker in legacy_markers)
+    start = 0 if legacy_enabled else _seller_markup_start(html_text)
+    if start == -1:
+        return []
+    markup = html_text[start:] if start else html_text
+    text = _decode_html(markup) if isinstance(markup, bytes) else markup
+    if parser is None:
+        parser = SellerItemParser()
+    else:
+        parser.reuse()
+    parser.legacy_enabled = legacy_enabled
+    parser.feed(text)
     result: List[Tuple[str, Optional[str]]] = []
     for href, price in parser.items:
         norm_price = price.strip() if isinstance(price, str) else price
@@ -150,15 +362,37 @@ def extract_seller_href_prices(html_text: str) -> List[Tuple[str, Optional[str]]
     return result
 
 
-def parse_ajax_response(text: str) -> Tuple[str, str]:
-    """Extract <rows> (base64) and <newPage> from an <ajaxResponse> payload."""
-    def extract_tag(tag: str) -> Optional[str]:
-        pattern = rf"<\s*{tag}[^>]*>([\s\S]*?)<\s*/\s*{tag}\s*>"
-        m = re.search(pattern, text, flags=re.IGNORECASE)
-        return m.group(1) if m else None
+def add_seller_items(href_prices: Dict[str, List[str]], items: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, List[str]]:
+    """Fold (href, price) pairs into href -> prices in order; hrefs without a price keep an empty list."""
+    for href, price in items:
+        prices = href_prices.setdefault(href, [])
+        if price:
+            prices.append(price)
+    return href_prices
 
-    rows_b64 = extract_tag("rows")
-    new_page = extract_tag("newPage")
+
+def _between(text: AnyStr, open_tag: AnyStr, close_tag: AnyStr) -> Optional[AnyStr]:
+    """Return the content of the first <tag ...>...</tag> in text (str or bytes), or None if absent."""
+    start = text.find(open_tag)
+    if start == -1:
+        return None
+    start = text.find(b">" if isinstance(text, bytes) else ">", start) + 1
+    end = text.find(close_tag, start) if start else -1
+    return text[start:end] if end != -1 else None
+
+
+def parse_ajax_response(text: Union[str, bytes]) -> Tuple[str, str]:
+    """Extract <rows> (base64) and <newPage> from an <ajaxResponse> payload.
+
+    Undecoded bytes are sliced directly, so only the rows themselves are decoded.
+    """
+    if isinstance(text, bytes):
+        rows_b64 = _between(text, b"<rows", b"</rows")
+        new_page_raw = _between(text, b"<newPage", b"</newPage")
+        new_page = new_page_raw.decode("utf-8", errors="ignore") if new_page_raw is not None else None
+    else:
+        rows_b64 = _between(text, "<rows", "</rows")
+        new_page = _between(text, "<newPage", "</newPage")
     if rows_b64 is None or new_page is None:
         missing = []
         if rows_b64 is None:
@@ -167,6 +401,7 @@ def parse_ajax_response(text: str) -> Tuple[str, str]:
             missing.append("newPage")
         raise ValueError(f"Missing tags: {', '.join(missing)}")
 
-    decoded = base64.b64decode(rows_b64, validate=False)
-    rows_html = decoded.decode("utf-8", errors="replace")
+    # Non-strict a2b_base64 skips line breaks and other non-alphabet bytes itself.
+    decoded = binascii.a2b_base64(rows_b64)
+    rows_html = decoded.decode("utf-8", errors="ignore")
     return rows_html, new_page.strip()
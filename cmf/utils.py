@@ -1,4 +1,9 @@
 from typing import Dict, Iterable
+import re
+
+# One name=value piece of a ';'-separated cookie string; pieces without '=' never match.
+_COOKIE_PAIR_RE = re.compile(r"(?:^|;)([^=;]*)=([^;]*)")
+_SET_COOKIE_ATTRIBUTES = frozenset({"path", "domain", "expires", "max-age", "secure", "httponly", "samesite", "priority"})
 
 
 def parse_headers(pairs: Iterable[str]) -> Dict[str, str]:
@@ -19,14 +24,8 @@ def sanitize_cookie_header(raw: str) -> str:
     """Convert pasted cookies or Set-Cookie content into a Cookie header value."""
     if not raw:
         return ""
-    parts = [p.strip() for p in raw.split(";") if p.strip()]
-    kept = []
-    skip = {"path", "domain", "expires", "max-age", "secure", "httponly", "samesite", "priority"}
-    for part in parts:
-        if "=" not in part:
-            continue
-        name, value = part.split("=", 1)
-        if name.strip().lower() in skip:
-            continue
-        kept.append(f"{name.strip()}={value.strip()}")
-    return "; ".join(kept)
+    return "; ".join(
+        f"{name.strip()}={value.strip()}"
+        for name, value in _COOKIE_PAIR_RE.findall(raw)
+        if name.strip().lower() not in _SET_COOKIE_ATTRIBUTES
+    )